@@ -1,4 +1,6 @@
 import streamlit as st
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from resources.ec2_manager import EC2Manager
 from resources.s3_manager import S3Manager
 from resources.route53_manager import Route53Manager
@@ -10,6 +12,141 @@ st.set_page_config(
     layout="wide"
 )
 
+# --- Shared Managers ---
+# Each manager holds boto3 clients (and their open HTTPS connections), so we
+# build them once per server process and reuse them on every rerun.
+# Don't set attributes on these objects - every user session shares them.
+@st.cache_resource
+def get_ec2_manager():
+    return EC2Manager()
+
+@st.cache_resource
+def get_s3_manager():
+    return S3Manager()
+
+@st.cache_resource
+def get_route53_manager():
+    return Route53Manager()
+
+# --- Cached Data Loaders ---
+# Streamlit re-runs this whole script on every click, so we keep the AWS list
+# results in memory for a few seconds instead of calling AWS on every rerun.
+# Any button that changes AWS state must clear the matching _load_*() cache.
+# Each loader returns the list together with its table and dropdown choices,
+# so they are built once per load and all expire at the same moment.
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_instances():
+    """Returns {"rows": [...], "df": DataFrame, "labels": [...], "label_map": {"Name (ID)": ID}}."""
+    instances = get_ec2_manager().list_instances()
+    labels, label_map = [], {}
+    for i in instances:
+        label = f"{i.Name} ({i.ID})"
+        labels.append(label)
+        label_map[label] = i.ID
+    return {"rows": instances, "df": pd.DataFrame(instances), "labels": labels, "label_map": label_map}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_buckets():
+    """Returns {"rows": [...], "df": DataFrame}."""
+    buckets = get_s3_manager().list_buckets()
+    return {"rows": buckets, "df": pd.DataFrame(buckets)}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _load_zones():
+    """Returns {"rows": [...], "df": DataFrame, "labels": [...], "label_map": {"Name (Id)": Id}, "names": {Id: Name}}."""
+    zones = get_route53_manager().list_hosted_zones()
+    labels, label_map, zone_names = [], {}, {}
+    for z in zones:
+        label = f"{z.Name} ({z.Id})"
+        labels.append(label)
+        label_map[label] = z.Id
+        zone_names[z.Id] = z.Name
+    return {"rows": zones, "df": pd.DataFrame(zones), "labels": labels, "label_map": label_map, "names": zone_names}
+
+# A window of up to 50 records starting at a name, cached per (zone, name) pair.
+# Capped so typing many different filters doesn't grow memory forever.
+@st.cache_data(ttl=30, show_spinner=False, max_entries=64)
+def _find_records(zone_id, start_name):
+    return get_route53_manager().list_records(zone_id, start_name=start_name, max_items=50)
+
+# One page of records at a time, fetched from AWS with a cursor (next_token)
+@st.cache_data(ttl=30, show_spinner=False, max_entries=64)
+def _list_records_page(zone_id, token):
+    return get_route53_manager().list_records_page(zone_id, token, PAGE_SIZE)
+
+# Big tables are sent to the browser one page at a time instead of all rows.
+# The current page index lives in st.session_state[key].
+PAGE_SIZE = 25
+
+def _shift_page(key, step):
+    st.session_state[key] += step
+
+def _push_token(key, token):
+    st.session_state[key].append(token)
+
+def _pop_token(key):
+    st.session_state[key].pop()
+
+def _show_paged_table(df, key, **dataframe_args):
+    """st.dataframe for just the current page of df, plus Prev/Next buttons when needed."""
+    pages = max(1, -(-len(df) // PAGE_SIZE))  # ceiling division
+    # After a page reload, start from the page saved in the URL
+    if key not in st.session_state:
+        saved = st.query_params.get(key, "0")
+        st.session_state[key] = int(saved) if saved.isdigit() else 0
+    # Clamp in case the list shrank (e.g. after a delete)
+    page = min(max(st.session_state[key], 0), pages - 1)
+    st.session_state[key] = page
+    st.query_params[key] = str(page)
+
+    st.dataframe(df.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE], **dataframe_args)
+
+    if pages > 1:
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button("◀ Prev", key=f"{key}_prev", disabled=page == 0,
+                      on_click=_shift_page, args=(key, -1))
+        with info_col:
+            st.caption(f"Page {page + 1} of {pages} ({len(df)} rows)")
+        with next_col:
+            st.button("Next ▶", key=f"{key}_next", disabled=page == pages - 1,
+                      on_click=_shift_page, args=(key, 1))
+
+# Selections are mirrored into the URL (?ec2_id=...&bucket=...&zone_id=...) so they
+# survive reruns and page reloads, and the user doesn't have to pick them again.
+def _restore_selection(key, param, labels, label_map=None, multi=False):
+    """Seed the widget state st.session_state[key] from the URL and drop labels that no longer exist."""
+    to_value = label_map.get if label_map else (lambda label: label)
+    if key not in st.session_state:
+        saved = st.query_params.get_all(param)
+        picked = [label for label in labels if to_value(label) in saved]
+        st.session_state[key] = picked if multi else (picked[0] if picked else labels[0])
+    elif multi:
+        st.session_state[key] = [label for label in st.session_state[key] if label in labels]
+    elif st.session_state[key] not in labels:
+        st.session_state[key] = labels[0]
+
+def _save_selection(param, values):
+    if values:
+        st.query_params[param] = values
+    else:
+        st.query_params.pop(param, None)
+
+def _prefetch_all():
+    """
+    Warm all three list caches at the same time (boto3 clients are thread-safe).
+    The first page load waits for the slowest AWS call instead of the sum of all
+    three, and switching services afterwards is instant.
+    """
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(loader) for loader in (_load_instances, _load_buckets, _load_zones)]
+        for f in futures:
+            try:
+                f.result()
+            except Exception:
+                # The service page will show the real error when it loads
+                pass
+
 # --- Title & Header ---
 st.title("☁️ Molcho Platform Engineering")
 st.markdown("### Self-Service Cloud Portal")
@@ -25,41 +162,108 @@ service = st.sidebar.radio(
 st.sidebar.markdown("---")
 st.sidebar.info("🔒 Logged in as: **Platform User**")
 
-# --- Routing Logic ---
-if "EC2" in service:
-    st.header("🖥️ EC2 Instance Management")
-    # Initialize the Manager (Logic)
-    ec2_manager = EC2Manager()
+# Only once per browser session - after that each page reads its own cache.
+# Runs after the header/sidebar so they show up while AWS is being called.
+if "prefetched" not in st.session_state:
+    _prefetch_all()
+    st.session_state["prefetched"] = True
+
+# --- EC2 Fragments ---
+# A fragment re-runs on its own when a widget inside it is clicked, so pressing
+# Start/Stop/Terminate (or typing in the Launch form) doesn't re-run the whole page.
+
+# manage_state action -> how it looks in the GUI
+EC2_ACTIONS = {
+    "start": {"label": "▶ Start", "icon": "▶", "done": "Starting {}..."},
+    "stop": {"label": "⏹ Stop", "icon": "⏹", "done": "Stopping {}..."},
+    "delete": {"label": "🗑 Terminate (Delete)", "icon": "🗑", "done": "Terminated {}."},
+}
+
+@st.fragment
+def ec2_panel():
+    """Instance table + Start/Stop/Terminate controls."""
+    ec2_manager = get_ec2_manager()
+    instances = []
+    data = {}
 
     # --- 1. List Instances (The Dashboard) ---
     st.subheader("Active Instances")
     try:
-        instances = ec2_manager.list_instances()
+        # Read inside the fragment so a fragment rerun picks up the refreshed cache
+        data = _load_instances()
+        instances = data["rows"]
         
         if not instances:
             st.info("No instances found. Launch one below! 👇")
         else:
-            # Convert the list of dictionaries to a Pandas DataFrame for a pretty table
-            import pandas as pd
-            df = pd.DataFrame(instances)
+            # The list as a Pandas DataFrame for a pretty table (built once per load)
+            df = data["df"]
             
-            # Show the table (use_container_width makes it fill the screen)
-            st.dataframe(
+            # Show the table one page at a time (width="stretch" makes it fill the screen)
+            _show_paged_table(
                 df, 
+                "ec2_page",
                 column_config={
-                    "InstanceId": "ID",
                     "State": "Status",
                     "Type": "Size",
                     "PublicIP": "Public IP"
                 },
-                use_container_width=True
+                width="stretch"
             )
     except Exception as e:
         st.error(f"Error loading instances: {e}")
 
     st.divider()
 
-    # --- 2. Create Instance Form ---
+    # --- 2. Manage Instances (Start/Stop/Delete) ---
+    st.subheader("⚙️ Manage Instance State")
+    
+    if instances:
+        # --- UX IMPROVEMENT: Mapping Names to IDs ---
+        # We create a dictionary where:
+        # Key (What you see): "ServerName (InstanceID)"
+        # Value (What code uses): "InstanceID"
+        instance_labels, instance_map = data["labels"], data["label_map"]
+        
+        # The dropdown now shows the readable keys (pick one or many)
+        _restore_selection("ec2_selection", "ec2_id", instance_labels, instance_map, multi=True)
+        selected_labels = st.multiselect("Select Instances to Manage:", instance_labels, key="ec2_selection")
+        
+        # We grab the actual IDs from our map to send to AWS
+        selected_ids = [instance_map[label] for label in selected_labels]
+        _save_selection("ec2_id", selected_ids)
+        selected_text = ", ".join(selected_labels)
+        
+        # One action picker + one Apply button (instead of a button per action)
+        action = st.segmented_control(
+            "Action:",
+            list(EC2_ACTIONS.keys()),
+            format_func=lambda a: EC2_ACTIONS[a]["label"],
+            default="start"
+        )
+        
+        # Type='primary' makes the button red/highlighted for Terminate
+        if st.button(
+            "Apply",
+            type="primary" if action == "delete" else "secondary",
+            disabled=not (selected_ids and action)
+        ):
+            details = EC2_ACTIONS[action]
+            # ONE API call for all the selected instances
+            with st.spinner(f"{details['label']}: {len(selected_ids)} instance(s)..."):
+                res = ec2_manager.manage_state(selected_ids, action)
+            if res.ok:
+                st.toast(details["done"].format(selected_text), icon=details["icon"])
+                _load_instances.clear()
+                st.rerun(scope="fragment")
+            else:
+                st.error(res.error)
+
+@st.fragment
+def ec2_launch_form():
+    """Launch New Instance form."""
+    ec2_manager = get_ec2_manager()
+
     st.subheader("🚀 Launch New Instance")
     
     # st.form prevents the page from reloading while you type
@@ -88,76 +292,47 @@ if "EC2" in service:
                         instance_type=instance_type
                     )
                     
-                    if "error" in result:
-                        st.error(f"Failed: {result['error']}")
+                    if not result.ok:
+                        st.error(f"Failed: {result.error}")
                     else:
-                        st.success(f"Success! Created instance {result['id']}")
-                        st.rerun()  # Force reload to show the new instance in the table
+                        st.toast(f"Success! Created instance {result.value}", icon="✅")
+                        _load_instances.clear()
+                        # App rerun: the instance table lives in a different fragment
+                        st.rerun()
+
+# --- Service Pages ---
+# Each page is its own fragment, so clicking a widget inside a page re-runs just
+# that page instead of the header and sidebar too. After a change, handlers clear
+# the matching cache, show a toast and call st.rerun(scope="fragment") so only
+# the page redraws with fresh data.
+
+@st.fragment
+def render_ec2():
+    st.header("🖥️ EC2 Instance Management")
+
+    ec2_panel()
 
     st.divider()
 
-    # --- 3. Manage Instances (Start/Stop/Delete) ---
-    st.subheader("⚙️ Manage Instance State")
-    
-    if instances:
-        # --- UX IMPROVEMENT: Mapping Names to IDs ---
-        # We create a dictionary where:
-        # Key (What you see): "ServerName (InstanceID)"
-        # Value (What code uses): "InstanceID"
-        instance_map = {f"{i['Name']} ({i['ID']})": i['ID'] for i in instances}
-        
-        # The dropdown now shows the readable keys
-        selected_label = st.selectbox("Select Instance to Manage:", list(instance_map.keys()))
-        
-        # We grab the actual ID from our map to send to AWS
-        selected_id = instance_map[selected_label]
-        
-        # Create 3 columns for the buttons
-        btn1, btn2, btn3 = st.columns(3)
-        
-        with btn1:
-            if st.button("▶ Start Instance"):
-                res = ec2_manager.manage_state(selected_id, "start")
-                if "success" in res:
-                    st.success(f"Starting {selected_label}...")
-                    st.rerun()
-                else:
-                    st.error(res.get("error"))
-
-        with btn2:
-            if st.button("⏹ Stop Instance"):
-                res = ec2_manager.manage_state(selected_id, "stop")
-                if "success" in res:
-                    st.warning(f"Stopping {selected_label}...")
-                    st.rerun()
-                else:
-                    st.error(res.get("error"))
-
-        with btn3:
-            # Type='primary' makes the button red/highlighted
-            if st.button("🗑 Terminate (Delete)", type="primary"):
-                res = ec2_manager.manage_state(selected_id, "delete")
-                if "success" in res:
-                    st.success(f"Terminated {selected_label}.")
-                    st.rerun()
-                else:
-                    st.error(res.get("error"))
+    ec2_launch_form()
 
-elif "S3" in service:
+@st.fragment
+def render_s3():
     st.header("📦 S3 Bucket Storage")
     
-    s3_manager = S3Manager()
+    s3_manager = get_s3_manager()
 
     # --- 1. List Buckets ---
     st.subheader("Existing Buckets")
     try:
-        buckets = s3_manager.list_buckets()
+        data = _load_buckets()
+        buckets = data["rows"]
         
         if not buckets:
             st.info("No tagged buckets found. (Buckets must have 'Project: platform-engineering' tag)")
         else:
             # FIX: Updated to remove warning (use_container_width -> width)
-            st.dataframe(buckets, width="stretch")
+            st.dataframe(data["df"], width="stretch")
     except Exception as e:
         st.error(f"Error loading buckets: {e}")
 
@@ -187,11 +362,12 @@ elif "S3" in service:
                     # We pass the public flag to the manager
                     res = s3_manager.create_bucket(clean_name, public=is_public)
                     
-                    if "error" in res:
-                        st.error(res['error'])
+                    if not res.ok:
+                        st.error(res.error)
                     else:
-                        st.success(f"Successfully created bucket: {clean_name}")
-                        st.rerun()
+                        st.toast(f"Successfully created bucket: {res.value}", icon="✅")
+                        _load_buckets.clear()
+                        st.rerun(scope="fragment")
 
     st.divider()
 
@@ -199,8 +375,10 @@ elif "S3" in service:
     st.subheader("📂 Manage Bucket Content")
     
     if buckets:
-        bucket_names = [b['Name'] for b in buckets]
-        selected_bucket = st.selectbox("Select Target Bucket:", bucket_names)
+        bucket_names = [b.Name for b in buckets]
+        _restore_selection("s3_bucket", "bucket", bucket_names)
+        selected_bucket = st.selectbox("Select Target Bucket:", bucket_names, key="s3_bucket")
+        _save_selection("bucket", selected_bucket)
 
         tab1, tab2 = st.tabs(["⬆ Upload File", "🗑 Delete Bucket"])
 
@@ -210,53 +388,48 @@ elif "S3" in service:
             
             if uploaded_file is not None:
                 if st.button("Upload to S3"):
-                    import tempfile
-                    import os
-                    
-                    with tempfile.NamedTemporaryFile(delete=False) as tmp:
-                        tmp.write(uploaded_file.getvalue())
-                        tmp_path = tmp.name
-                    
-                    try:
-                        with st.spinner("Uploading..."):
-                            res = s3_manager.upload_file(
-                                selected_bucket, 
-                                tmp_path, 
-                                object_name=uploaded_file.name
-                            )
-                            
-                            if "success" in res:
-                                st.success(f"✅ Uploaded '{uploaded_file.name}' to {selected_bucket}")
-                            else:
-                                st.error(res.get('error'))
-                    finally:
-                        os.unlink(tmp_path)
+                    with st.spinner("Uploading..."):
+                        # Stream the in-memory upload directly to S3 (no temp file)
+                        res = s3_manager.upload_fileobj(
+                            selected_bucket, 
+                            uploaded_file, 
+                            object_name=uploaded_file.name
+                        )
+                        
+                        if res.ok:
+                            st.success(f"✅ Uploaded '{uploaded_file.name}' to {selected_bucket}")
+                        else:
+                            st.error(res.error)
 
         # TAB 2: Delete Logic
         with tab2:
             st.warning("⚠️ Warning: Bucket must be empty before deleting.")
+            force_delete = st.checkbox("Also delete all objects in the bucket")
             
             if st.button("Delete Bucket", type="primary"):
-                res = s3_manager.delete_bucket(selected_bucket)
-                if "success" in res:
-                    st.success(f"Deleted {selected_bucket}")
-                    st.rerun()
+                res = s3_manager.delete_bucket(selected_bucket, force=force_delete)
+                if res.ok:
+                    st.toast(f"Deleted {selected_bucket}", icon="🗑")
+                    _load_buckets.clear()
+                    st.rerun(scope="fragment")
                 else:
-                    st.error(res.get('error'))
+                    st.error(res.error)
 
-elif "Route53" in service:
+@st.fragment
+def render_route53():
     st.header("🌐 Route53 DNS Manager")
     
-    route53_manager = Route53Manager()
+    route53_manager = get_route53_manager()
 
     # --- 1. List Hosted Zones ---
     st.subheader("Hosted Zones (Domains)")
     try:
-        zones = route53_manager.list_hosted_zones()
+        data = _load_zones()
+        zones = data["rows"]
         if not zones:
             st.info("No hosted zones found.")
         else:
-            st.dataframe(zones, width="stretch")
+            st.dataframe(data["df"], width="stretch")
     except Exception as e:
         st.error(f"Error loading zones: {e}")
 
@@ -274,11 +447,12 @@ elif "Route53" in service:
                 else:
                     with st.spinner("Creating Hosted Zone..."):
                         res = route53_manager.create_hosted_zone(domain_name, private_zone)
-                        if "error" in res:
-                            st.error(res['error'])
+                        if not res.ok:
+                            st.error(res.error)
                         else:
-                            st.success(f"Created zone: {res['Id']}")
-                            st.rerun()
+                            st.toast(f"Created zone: {res.value}", icon="✅")
+                            _load_zones.clear()
+                            st.rerun(scope="fragment")
 
     st.divider()
 
@@ -287,21 +461,40 @@ elif "Route53" in service:
         st.subheader("📝 Manage DNS Records")
         
         # Create a map: "molcho.com (Z123...)" -> "Z123..."
-        zone_map = {f"{z['Name']} ({z['Id']})": z['Id'] for z in zones}
-        selected_zone_label = st.selectbox("Select Zone to Manage:", list(zone_map.keys()))
+        zone_labels, zone_map, zone_names = data["labels"], data["label_map"], data["names"]
+        _restore_selection("r53_zone", "zone_id", zone_labels, zone_map)
+        selected_zone_label = st.selectbox("Select Zone to Manage:", zone_labels, key="r53_zone")
         selected_zone_id = zone_map[selected_zone_label]
+        _save_selection("zone_id", selected_zone_id)
         
         # TABS for viewing vs creating
         tab_view, tab_add, tab_del = st.tabs(["👁 View Records", "➕ Add Record", "❌ Delete Record"])
         
         # TAB 1: View
         with tab_view:
-            records = route53_manager.list_records(selected_zone_id)
-            if records:
-                st.dataframe(records, width="stretch")
+            # Zones can hold thousands of records, so only ask AWS for the page being viewed.
+            # The stack holds the cursor of every page we walked through (None = first page).
+            tokens_key = f"records_tokens_{selected_zone_id}"
+            tokens = st.session_state.setdefault(tokens_key, [None])
+            page = _list_records_page(selected_zone_id, tokens[-1])
+
+            if page["records"]:
+                # A single page is small - building its table directly is cheaper than caching it
+                st.dataframe(pd.DataFrame(page["records"]), width="stretch")
             else:
                 st.info("No records found in this zone.")
 
+            if len(tokens) > 1 or page["next_token"]:
+                prev_col, info_col, next_col = st.columns([1, 2, 1])
+                with prev_col:
+                    st.button("◀ Prev", key="records_prev", disabled=len(tokens) == 1,
+                              on_click=_pop_token, args=(tokens_key,))
+                with info_col:
+                    st.caption(f"Page {len(tokens)}")
+                with next_col:
+                    st.button("Next ▶", key="records_next", disabled=not page["next_token"],
+                              on_click=_push_token, args=(tokens_key, page["next_token"]))
+
         # TAB 2: Add Record
         with tab_add:
             with st.form("add_record_form"):
@@ -324,28 +517,66 @@ elif "Route53" in service:
                         full_name = r_name # The manager might handle the full name logic
                         
                         res = route53_manager.create_record(selected_zone_id, full_name, r_type, r_value, r_ttl)
-                        if "success" in res:
-                            st.success(f"Created record: {full_name} -> {r_value}")
-                            st.rerun()
+                        if res.ok:
+                            st.toast(f"Created record: {full_name} -> {r_value}", icon="✅")
+                            # Record count on the zone changes too
+                            _find_records.clear()
+                            _list_records_page.clear()
+                            _load_zones.clear()
+                            st.rerun(scope="fragment")
                         else:
-                            st.error(res.get('error'))
+                            st.error(res.error)
 
         # TAB 3: Delete Record
         with tab_del:
             st.warning("⚠️ Deleting records can break your site.")
             # We need to pick a record to delete. 
-            # We'll use a dropdown of existing records.
-            if records:
+            # We'll use a dropdown of existing records, but only a window of them:
+            # AWS starts listing at the typed name instead of sending the whole zone.
+            name_filter = st.text_input("Filter by name", placeholder="www", key="record_filter").strip()
+
+            start_name = None
+            if name_filter:
+                # Route53 wants a full record name to start from (e.g. 'www' -> 'www.molcho.com.')
+                zone_name = zone_names[selected_zone_id]
+                if name_filter.rstrip('.').endswith(zone_name.rstrip('.')):
+                    start_name = name_filter
+                else:
+                    start_name = f"{name_filter}.{zone_name}"
+
+            records = [r for r in _find_records(selected_zone_id, start_name) if r.Name.startswith(name_filter)]
+            if not records:
+                st.info("No matching records.")
+            else:
                 # Create readable list: "www.molcho.com. (A)"
-                record_map = {f"{r['Name']} ({r['Type']})": r for r in records}
-                selected_rec_label = st.selectbox("Select Record to Delete:", list(record_map.keys()))
+                # The dropdown returns a position, so we index straight into 'records'
+                # instead of keeping a label -> record dict around.
+                record_labels = [f"{r.Name} ({r.Type})" for r in records]
+                selected_rec_idx = st.selectbox(
+                    "Select Record to Delete:",
+                    range(len(records)),
+                    format_func=record_labels.__getitem__
+                )
                 
                 if st.button("Delete Selected Record", type="primary"):
-                    target = record_map[selected_rec_label]
+                    target = records[selected_rec_idx]
                     # We need to send the exact values to delete safely
-                    res = route53_manager.delete_record(selected_zone_id, target['Name'], target['Type'], target['Value'])
-                    if "success" in res:
-                        st.success("Record deleted.")
-                        st.rerun()
+                    res = route53_manager.delete_record(selected_zone_id, target.Name, target.Type, target.Value)
+                    if res.ok:
+                        st.toast("Record deleted.", icon="🗑")
+                        _find_records.clear()
+                        _list_records_page.clear()
+                        _load_zones.clear()
+                        st.rerun(scope="fragment")
                     else:
-                        st.error(res.get('error'))
+                        st.error(res.error)
+
+# --- Routing Logic ---
+# Radio label -> page function (exact match, one dict lookup)
+RENDERERS = {
+    "EC2 (Compute)": render_ec2,
+    "S3 (Storage)": render_s3,
+    "Route53 (DNS)": render_route53,
+}
+
+RENDERERS[service]()
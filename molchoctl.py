@@ -1,77 +1,49 @@
 #!/usr/bin/env python3
 
 import click
+import functools
+import json
 import os
 import sys
 import subprocess
 from rich.console import Console
 from rich.table import Table
-
-from resources.ec2_manager import EC2Manager
-from resources.s3_manager import S3Manager
-from resources.route53_manager import Route53Manager
+from rich.text import Text
 
 # Initialize Rich Console
 console = Console()
 
-# --- 1. Define the "Bottom Section" (Examples & Syntax) ---
-EXAMPLES = """
-----------------------------------------------------------------------------------------
-EC2 (Server Management)
-
-  Commands:
-    create, list, start, stop, delete
-
-  Arguments:
-    --name <name_of_instance>   Name tag for the server
-    --os <ubuntu|amazon_linux>  Operating System choice
-    --type <t3.micro|t2.small>  Instance Size
-    --id <instance_id>          Target Instance ID (Required for start/stop/delete)
-
-  Examples:
-    molchoctl ec2 create --name web-01 --os amazon_linux --type t3.micro
-    molchoctl ec2 list
-    molchoctl ec2 stop --id i-0123456789abcdef0
-    molchoctl ec2 start --id i-0123456789abcdef0
-    molchoctl ec2 delete --id i-0123456789abcdef0
-
-----------------------------------------------------------------------------------------
-S3 (Object Storage)
-
-  Commands:
-    create, list, delete, upload
-
-  Arguments:
-    --name <bucket_name>      Globally Unique Name of the bucket (for create/delete)
-    --public                  Flag: If present, makes the bucket Public (Read-Only)
-    --bucket <bucket_name>    Target bucket (for upload)
-    --file <file_path>        Path to the file
-    --yes                     Flag: Confirm deletion automatically (skip prompt)
-
-  Examples:
-    molchoctl s3 create --name example-secure-bucket
-    molchoctl s3 create --name example-public-bucket --public
-    molchoctl s3 list
-    molchoctl s3 upload --bucket example-secure-bucket --file ./index.html
-    molchoctl s3 delete --name example-secure-bucket
-    molchoctl s3 delete --name example-public-bucket --yes
-
-----------------------------------------------------------------------------------------
-Route53 (DNS Management)
-
-  Commands:
-    create-zone, list-zones, create
-
-  Arguments:
-    --name <domain_name>      Name of Zone or Record
-    --zone <zone_id>          The Hosted Zone ID (Get this from list-zones)
-    --ip <ip_address>         The Target IP Address for the record
-
-  Examples:
-    molchoctl route53 create-zone --name example-zone.com
-    molchoctl route53 list-zones
-    molchoctl route53 create --zone Z0123456789 --name web.example-zone.com --ip 1.2.3.4
-"""
+# Pre-styled state cells. The same few states repeat on every row, so we build
+# each Text once instead of having Rich parse "[green]running[/green]" per row.
+STATE_CELLS = {
+    state: Text(state, style="green" if state == 'running' else "red")
+    for state in ('pending', 'running', 'shutting-down', 'terminated', 'stopping', 'stopped')
+}
+
+# --- Lazy Managers ---
+# Importing the managers pulls in boto3, which is slow to load. We import them
+# only when a command actually talks to AWS, so `molchoctl -h` stays instant.
+@functools.cache
+def _ec2():
+    from resources.ec2_manager import EC2Manager
+    return EC2Manager()
+
+@functools.cache
+def _s3():
+    from resources.s3_manager import S3Manager
+    return S3Manager()
+
+@functools.cache
+def _route53():
+    from resources.route53_manager import Route53Manager
+    return Route53Manager()
+
+# --- 1. Help Text (Banner & Examples) ---
+# The ASCII banner and the cheat sheet live in resources/*.txt and are only read
+# when help is actually printed, so regular commands never load them.
+def _help_text(name):
+    from importlib.resources import files
+    return files('resources').joinpath(name).read_text(encoding='utf-8')
 
 # --- 2. Define the Custom Class (The Pager Logic) ---
 class PagedGroup(click.Group):
@@ -82,8 +54,12 @@ class PagedGroup(click.Group):
     def get_help(self, ctx):
         # Generate the standard help text
         help_text = super().get_help(ctx)
-        # Send it to the pager (user presses 'q' to exit)
-        click.echo_via_pager(help_text)
+        if sys.stdout.isatty():
+            # Send it to the pager (user presses 'q' to exit)
+            click.echo_via_pager(help_text)
+        else:
+            # Piped/captured output (scripts, CI): no need to spawn 'less'
+            click.echo(help_text)
         # Exit the program immediately so Click doesn't try to print the text again
         ctx.exit()
 
@@ -91,9 +67,15 @@ class PagedGroup(click.Group):
         """
         Overriding this method allows us to change the ORDER of the output.
         """
+        # Shell completion never shows the banner or the cheat sheet - keep it minimal
+        if os.environ.get('_MOLCHOCTL_COMPLETE'):
+            self.format_usage(ctx, formatter)
+            self.format_options(ctx, formatter)
+            return
+
         # 1. Print Welcome Message (Flush Left, No Indent)
-        # We access the docstring directly to avoid Click's auto-indentation
-        formatter.write(self.help + "\n\n")
+        # We write the banner directly to avoid Click's auto-indentation
+        formatter.write(_help_text('banner.txt') + "\n")
 
         # 2. Print Usage
         self.format_usage(ctx, formatter)
@@ -102,8 +84,7 @@ class PagedGroup(click.Group):
         self.format_options(ctx, formatter)
         
         # 4. Print the Cheat Sheet (Raw, preserving our spacing)
-        if self.epilog:
-            formatter.write("\n" + self.epilog + "\n")
+        formatter.write("\n\n" + _help_text('help.txt') + "\n")
 
 
     def resolve_command(self, ctx, args):
@@ -119,26 +100,11 @@ class PagedGroup(click.Group):
 @click.group(
     cls=PagedGroup,  # Use our custom Pager class
     context_settings={'help_option_names': ['-h', '--help']}, # Enable -h
-    epilog=EXAMPLES  # Add the examples to the bottom
+    epilog=None  # The examples are added lazily by PagedGroup.format_help
 )
 @click.version_option(version='1.0.0', prog_name='molchoctl')
 def cli():
-    """ ██████   ██████          ████           █████                                    █████    ████ 
-▒▒██████ ██████          ▒▒███          ▒▒███                                    ▒▒███    ▒▒███ 
- ▒███▒█████▒███   ██████  ▒███   ██████  ▒███████    ██████              ██████  ███████   ▒███ 
- ▒███▒▒███ ▒███  ███▒▒███ ▒███  ███▒▒███ ▒███▒▒███  ███▒▒███ ██████████ ███▒▒███▒▒▒███▒    ▒███ 
- ▒███ ▒▒▒  ▒███ ▒███ ▒███ ▒███ ▒███ ▒▒▒  ▒███ ▒███ ▒███ ▒███▒▒▒▒▒▒▒▒▒▒ ▒███ ▒▒▒   ▒███     ▒███ 
- ▒███      ▒███ ▒███ ▒███ ▒███ ▒███  ███ ▒███ ▒███ ▒███ ▒███           ▒███  ███  ▒███ ███ ▒███ 
- █████     █████▒▒██████  █████▒▒██████  ████ █████▒▒██████            ▒▒██████   ▒▒█████  █████
-▒▒▒▒▒     ▒▒▒▒▒  ▒▒▒▒▒▒  ▒▒▒▒▒  ▒▒▒▒▒▒  ▒▒▒▒ ▒▒▒▒▒  ▒▒▒▒▒▒              ▒▒▒▒▒▒     ▒▒▒▒▒  ▒▒▒▒▒ 
-                                                                                                
-                                                                                                
-                                                                                                
-
-Welcome to the Molcho Platform Engineering CLI!
-
-Manage AWS resources (EC2, S3, Route53) safely.
-"""
+    """Molcho Platform Engineering CLI - manage AWS resources (EC2, S3, Route53) safely."""
     pass
 
 # EC2 Management Group
@@ -154,28 +120,23 @@ def ec2():
 @click.option('--name', required=True, help='Name tag for the server')
 def create(instance_type, os_type, name):
     """Provision a new EC2 instance."""
-    manager = EC2Manager()
+    manager = _ec2()
     
     console.print(f"[bold blue]Provisioning {os_type} instance ({instance_type})...[/bold blue]")
     
     # Run the logic
     result = manager.create_instance(instance_type, name, os_type)
     
-    if "error" in result:
-        console.print(f"[bold red]FAILED:[/bold red] {result['error']}")
+    if not result.ok:
+        console.print(f"[bold red]FAILED:[/bold red] {result.error}")
         return
     else:
-        console.print(f"[bold green]SUCCESS:[/bold green] Created instance [bold]{result['id']}[/bold]")
+        console.print(f"[bold green]SUCCESS:[/bold green] Created instance [bold]{result.value}[/bold]")
 
 @ec2.command("list")
 def list_instances():
     """List all instances created by this tool."""
-    manager = EC2Manager()
-    instances = manager.list_instances()
-
-    if not instances:
-        console.print("[yellow]No instances found with tag 'CreatedBy=molcho-platform-cli'[/yellow]")
-        return
+    manager = _ec2()
 
     # Creates a pretty table
     table = Table(title="My Platform Instances")
@@ -185,30 +146,35 @@ def list_instances():
     table.add_column("State")
     table.add_column("Public IP", style="green")
 
-    for i in instances:
+    # Rows go straight from the paginator into the table - no intermediate list
+    for i in manager.iter_instances():
         # Color code the state
-        state_style = "green" if i['State'] == 'running' else "red"
+        state_cell = STATE_CELLS.get(i.State) or Text(i.State, style="red")
         
         table.add_row(
-            i['ID'],
-            i['Name'],
-            i['Type'],
-            f"[{state_style}]{i['State']}[/{state_style}]",
-            i['PublicIP']
+            i.ID,
+            i.Name,
+            i.Type,
+            state_cell,
+            i.PublicIP
         )
 
+    if not table.row_count:
+        console.print("[yellow]No instances found with tag 'CreatedBy=molcho-platform-cli'[/yellow]")
+        return
+
     console.print(table)
 
 @ec2.command()
 @click.option('--id', 'instance_id', required=True, help='Instance ID (i-xxxx)')
 def start(instance_id):
     """Start a stopped instance."""
-    manager = EC2Manager()
+    manager = _ec2()
     console.print(f"Starting {instance_id}...")
     result = manager.manage_state(instance_id, 'start')
     
-    if "error" in result:
-        console.print(f"[red]Error:[/red] {result['error']}")
+    if not result.ok:
+        console.print(f"[red]Error:[/red] {result.error}")
     else:
         console.print(f"[green]Signal sent to start {instance_id}[/green]")
 
@@ -216,12 +182,12 @@ def start(instance_id):
 @click.option('--id', 'instance_id', required=True, help='Instance ID (i-xxxx)')
 def stop(instance_id):
     """Stop a running instance."""
-    manager = EC2Manager()
+    manager = _ec2()
     console.print(f"Stopping {instance_id}...")
     result = manager.manage_state(instance_id, 'stop')
     
-    if "error" in result:
-        console.print(f"[red]Error:[/red] {result['error']}")
+    if not result.ok:
+        console.print(f"[red]Error:[/red] {result.error}")
     else:
         console.print(f"[green]Signal sent to stop {instance_id}[/green]")
 
@@ -230,12 +196,12 @@ def stop(instance_id):
 @click.confirmation_option(prompt='Are you sure you want to PERMANENTLY delete this server?')
 def delete(instance_id):
     """Terminate (delete) an instance."""
-    manager = EC2Manager()
+    manager = _ec2()
     console.print(f"[bold red]Terminating {instance_id}...[/bold red]")
     result = manager.manage_state(instance_id, 'delete')
     
-    if "error" in result:
-        console.print(f"[red]Error:[/red] {result['error']}")
+    if not result.ok:
+        console.print(f"[red]Error:[/red] {result.error}")
     else:
         console.print(f"[green]Instance {instance_id} terminated.[/green]")
 
@@ -244,12 +210,12 @@ def delete(instance_id):
 @click.option('--type', 'new_type', required=True, help='New Instance Type (e.g. t2.small)')
 def update(instance_id, new_type):
     """Update instance type (Resize). Instance must be stopped."""
-    manager = EC2Manager()
+    manager = _ec2()
     console.print(f"Resizing {instance_id} to {new_type}...")
     result = manager.update_instance(instance_id, new_type)
     
-    if "error" in result:
-        console.print(f"[red]Error:[/red] {result['error']}")
+    if not result.ok:
+        console.print(f"[red]Error:[/red] {result.error}")
     else:
         console.print(f"[green]Success! Instance resized.[/green]")
 
@@ -261,11 +227,11 @@ def s3():
     pass
 
 @s3.command()
-@click.option('--name', required=True, help='Bucket Name (Must be globally unique)')
+@click.option('--name', required=True, help="Bucket Name (Must be globally unique, 'molcho-cli-' is added in front)")
 @click.option('--public', is_flag=True, help='Make bucket PUBLIC (Dangerous!)')
 def create(name, public):
     """Create a new S3 bucket (Private by default)."""
-    manager = S3Manager()
+    manager = _s3()
     
     # 1. Safety Check for Public Buckets
     if public:
@@ -279,44 +245,44 @@ def create(name, public):
     # 2. Run Logic
     result = manager.create_bucket(name, public)
     
-    if "error" in result:
-        console.print(f"[bold red]FAILED:[/bold red] {result['error']}")
+    if not result.ok:
+        console.print(f"[bold red]FAILED:[/bold red] {result.error}")
     else:
         status_color = "red" if public else "green"
-        console.print(f"[bold green]SUCCESS:[/bold green] Bucket created.")
-        console.print(f"Status: [bold {status_color}]{result['status']}[/bold {status_color}]")
+        console.print(f"[bold green]SUCCESS:[/bold green] Bucket [bold]{result.value}[/bold] created.")
+        console.print(f"Status: [bold {status_color}]created[/bold {status_color}]")
 
 @s3.command("list")
 def list_buckets():
     """List buckets created by this tool."""
-    manager = S3Manager()
-    buckets = manager.list_buckets()
-
-    if not buckets:
-        console.print("[yellow]No managed buckets found.[/yellow]")
-        return
+    manager = _s3()
 
     table = Table(title="My S3 Buckets")
     table.add_column("Name", style="cyan")
     table.add_column("Created At", style="magenta")
 
-    for b in buckets:
-        table.add_row(b['Name'], b['CreationDate'])
+    for b in manager.iter_buckets():
+        table.add_row(b.Name, b.CreationDate)
+
+    if not table.row_count:
+        console.print("[yellow]No managed buckets found.[/yellow]")
+        return
 
     console.print(table)
 
 @s3.command()
 @click.option('--name', required=True, help='Bucket Name')
+@click.option('--force', is_flag=True, help='Delete all objects in the bucket first')
 @click.confirmation_option(prompt='Are you sure you want to PERMANENTLY delete this bucket?')
-def delete(name):
-    """Delete an S3 bucket (Must be empty)."""
-    manager = S3Manager()
+def delete(name, force):
+    """Delete an S3 bucket (Must be empty, unless --force)."""
+    manager = _s3()
     console.print(f"[bold red]Deleting bucket {name}...[/bold red]")
     
-    result = manager.delete_bucket(name)
+    result = manager.delete_bucket(name, force=force)
     
-    if "error" in result:
-        console.print(f"[bold red]Error:[/bold red] {result['error']}")
+    if not result.ok:
+        console.print(f"[bold red]Error:[/bold red] {result.error}")
     else:
         console.print(f"[bold green]Bucket {name} deleted.[/bold green]")
 
@@ -326,16 +292,41 @@ def delete(name):
 @click.option('--file', 'file_path', required=True, help='Path to file on your computer')
 def upload(bucket, file_path):
     """Securely upload a file to a managed bucket."""
-    manager = S3Manager()
+    from rich.progress import Progress, BarColumn, DownloadColumn, TransferSpeedColumn
+
+    manager = _s3()
     console.print(f"Uploading [bold]{file_path}[/bold] to [bold]{bucket}[/bold]...")
+
+    # boto3 reports bytes sent per chunk (from its worker threads) - feed that into a bar
+    total = os.path.getsize(file_path) if os.path.isfile(file_path) else None
+    with Progress("{task.description}", BarColumn(), DownloadColumn(), TransferSpeedColumn(),
+                  console=console, transient=True) as progress:
+        task = progress.add_task(os.path.basename(file_path), total=total)
+        result = manager.upload_file(bucket, file_path,
+                                     callback=lambda sent: progress.advance(task, sent))
     
-    result = manager.upload_file(bucket, file_path)
-    
-    if "error" in result:
-        console.print(f"[bold red]FAILED:[/bold red] {result['error']}")
+    if not result.ok:
+        console.print(f"[bold red]FAILED:[/bold red] {result.error}")
     else:
         console.print(f"[bold green]SUCCESS:[/bold green] File uploaded successfully.")
 
+@s3.command("upload-many")
+@click.option('--bucket', 'buckets', required=True, multiple=True, help='Target Bucket Name (repeat to spread files over several buckets)')
+@click.argument('file_paths', nargs=-1, required=True)
+def upload_many(buckets, file_paths):
+    """Upload many files in parallel (spread over one or more buckets)."""
+    manager = _s3()
+    console.print(f"Uploading [bold]{len(file_paths)}[/bold] files to [bold]{', '.join(buckets)}[/bold]...")
+
+    result = manager.upload_many(list(buckets), list(file_paths))
+
+    for file_path, bucket, key in result.value or []:
+        console.print(f"  {file_path} -> s3://{bucket}/{key}")
+    if not result.ok:
+        console.print(f"[bold red]FAILED:[/bold red] {result.error}")
+    else:
+        console.print(f"[bold green]SUCCESS:[/bold green] {len(result.value)} files uploaded.")
+
 # Route53 Management Group
 
 @cli.group()
@@ -346,19 +337,18 @@ def route53():
 @route53.command("list-zones")
 def list_zones():
     """List available Hosted Zones."""
-    manager = Route53Manager()
-    zones = manager.list_hosted_zones()
-
-    if not zones:
-        console.print("[yellow]No Hosted Zones found.[/yellow]")
-        return
+    manager = _route53()
 
     table = Table(title="Available DNS Zones")
     table.add_column("Zone ID", style="cyan")
     table.add_column("Domain Name", style="green")
 
-    for z in zones:
-        table.add_row(z['Id'].split('/')[-1], z['Name'])
+    for z in manager.iter_hosted_zones():
+        table.add_row(z.Id.split('/')[-1], z.Name)
+
+    if not table.row_count:
+        console.print("[yellow]No Hosted Zones found.[/yellow]")
+        return
 
     console.print(table)
 
@@ -366,30 +356,51 @@ def list_zones():
 @click.option('--name', required=True, help='Domain Name (Must start with molcho-)')
 def create_zone_cmd(name):
     """Create a new Hosted Zone (DNS Domain)."""
-    manager = Route53Manager()
+    manager = _route53()
     console.print(f"[bold blue]Creating Hosted Zone {name}...[/bold blue]")
     
     result = manager.create_zone(name)
     
-    if "error" in result:
-        console.print(f"[bold red]FAILED:[/bold red] {result['error']}")
+    if not result.ok:
+        console.print(f"[bold red]FAILED:[/bold red] {result.error}")
     else:
         console.print(f"[bold green]SUCCESS:[/bold green] Zone created.")
-        console.print(f"Zone ID: [cyan]{result['id']}[/cyan]")
+        console.print(f"Zone ID: [cyan]{result.value}[/cyan]")
 
 @route53.command()
 @click.option('--zone', required=True, help='Hosted Zone ID (Get this from list-zones)')
-@click.option('--name', required=True, help='Full Record Name (e.g., molcho-web.somedomain.com)')
-@click.option('--ip', required=True, help='Target IP Address')
-def create(zone, name, ip):
-    """Create a DNS Record (A Record)."""
-    manager = Route53Manager()
+@click.option('--name', help='Full Record Name (e.g., molcho-web.somedomain.com)')
+@click.option('--ip', help='Target IP Address')
+@click.option('--from-file', 'from_file', type=click.File('r'), help='JSON list of records: [{"name": ..., "value": ..., "type": "A", "ttl": 300}]')
+def create(zone, name, ip, from_file):
+    """Create a DNS Record (A Record), or many at once with --from-file."""
+    manager = _route53()
+
+    if from_file:
+        try:
+            records = json.load(from_file)
+        except ValueError as e:
+            console.print(f"[bold red]Error:[/bold red] Invalid JSON in {from_file.name}: {e}")
+            return
+        if isinstance(records, list):
+            console.print(f"[bold blue]Creating {len(records)} records in {zone}...[/bold blue]")
+        result = manager.create_records(zone, records)
+        if not result.ok:
+            console.print(f"[bold red]FAILED:[/bold red] {result.error}")
+        else:
+            console.print(f"[bold green]SUCCESS:[/bold green] {result.value} DNS records created/updated.")
+        return
+
+    if not name or not ip:
+        console.print("[bold red]Error:[/bold red] --name and --ip are required (or use --from-file).")
+        return
+
     console.print(f"[bold blue]Pointing {name} -> {ip}...[/bold blue]")
     
-    result = manager.create_record(zone, name, ip)
+    result = manager.create_record(zone, name, 'A', ip)
     
-    if "error" in result:
-        console.print(f"[bold red]FAILED:[/bold red] {result['error']}")
+    if not result.ok:
+        console.print(f"[bold red]FAILED:[/bold red] {result.error}")
     else:
         console.print(f"[bold green]SUCCESS:[/bold green] DNS Record created/updated.")
 
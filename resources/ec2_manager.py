@@ -1,11 +1,29 @@
-import boto3
+import time
+from types import MappingProxyType
 from botocore.exceptions import ClientError
-from utils.tags import format_as_ec2_tags
+from utils.tags import format_as_ec2_tags, tags_to_dict
+from utils.aws_config import get_client
+from utils.results import OpResult, Instance
+
+# Map user OS choice to the official AWS SSM Parameter path (read-only, built once)
+_SSM_AMI_PATHS = MappingProxyType({
+    'amazon_linux': '/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64',
+    'ubuntu': '/aws/service/canonical/ubuntu/server/24.04/stable/current/amd64/hvm/ebs-gp3/ami-id'
+})
+
+# Instance IDs already confirmed to carry our CreatedBy tag. Ownership never
+# changes, so start/stop/delete on a known ID can skip the extra describe call.
+_KNOWN_OWNED = set()
+
+# Latest AMI per (region, SSM path): {key: (ami_id, fetched_at)}. AWS updates these
+# parameters at most weekly, so one SSM lookup per hour is plenty.
+_AMI_CACHE = {}
+_AMI_CACHE_TTL = 3600  # seconds
 
 class EC2Manager:
     def __init__(self, region='us-east-1'):
-        self.ec2 = boto3.client('ec2', region_name=region)
-        self.ssm = boto3.client('ssm', region_name=region)
+        self.ec2 = get_client('ec2', region)
+        self.ssm = get_client('ssm', region)
         # TAG FILTER: Matches your username from utils/tags.py
         self.TAG_FILTER = {'Name': 'tag:CreatedBy', 'Values': ['molcho-platform-cli']}
 
@@ -13,18 +31,21 @@ class EC2Manager:
         """
         Fetches the latest AMI ID dynamically from AWS SSM Public Parameters.
         """
-        # Map user choice to the official AWS SSM Parameter path
-        ssm_paths = {
-            'amazon_linux': '/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64',
-            'ubuntu': '/aws/service/canonical/ubuntu/server/22.04/stable/current/amd64/hvm/ebs-gp2/ami-id'
-        }
-        
         # Default to Amazon Linux if something goes wrong with the key
-        path = ssm_paths.get(os_type, ssm_paths['amazon_linux'])
+        path = _SSM_AMI_PATHS.get(os_type, _SSM_AMI_PATHS['amazon_linux'])
+
+        # Reuse a recent lookup instead of calling SSM again
+        # (AMI IDs differ per region, so the region is part of the key)
+        cache_key = (self.ssm.meta.region_name, path)
+        cached = _AMI_CACHE.get(cache_key)
+        if cached and time.monotonic() - cached[1] < _AMI_CACHE_TTL:
+            return cached[0]
 
         try:
             response = self.ssm.get_parameter(Name=path, WithDecryption=False)
-            return response['Parameter']['Value']
+            ami_id = response['Parameter']['Value']
+            _AMI_CACHE[cache_key] = (ami_id, time.monotonic())
+            return ami_id
         except ClientError as e:
             print(f"Error fetching AMI for {os_type}: {e}")
             # Fallback hardcoded IDs (us-east-1) in case SSM fails
@@ -32,30 +53,51 @@ class EC2Manager:
                 return "ami-0c7217cdde317cfec" # Ubuntu 22.04
             return "ami-04b70fa74e45c3917"    # AL2023
 
-    def list_instances(self):
-        """List only instances created by this CLI."""
+    def _format_instance(self, inst):
+        """Flatten one raw describe_instances entry into the row shape the CLI/GUI show."""
+        # Tags come as [{'Key': ..., 'Value': ...}] - turn them into one dict we can index
+        tags = tags_to_dict(inst.get('Tags', ()))
+        
+        return Instance(
+            ID=inst['InstanceId'],
+            State=inst['State']['Name'],
+            Type=inst['InstanceType'],
+            Name=tags.get('Name', 'N/A'),
+            PublicIP=inst.get('PublicIpAddress', 'N/A')
+        )
+
+    def iter_instances(self):
+        """
+        Yield CLI-created instances one row at a time while the paginator walks pages,
+        so callers can render rows without holding the whole account in memory.
+        """
         try:
-            response = self.ec2.describe_instances(Filters=[self.TAG_FILTER])
-            instances = []
-            for reservation in response['Reservations']:
-                for inst in reservation['Instances']:
-                    name = "N/A"
-                    if 'Tags' in inst:
-                        for t in inst['Tags']:
-                            if t['Key'] == 'Name':
-                                name = t['Value']
-                    
-                    instances.append({
-                        'ID': inst['InstanceId'],
-                        'State': inst['State']['Name'],
-                        'Type': inst['InstanceType'],
-                        'Name': name,
-                        'PublicIP': inst.get('PublicIpAddress', 'N/A')
-                    })
-            return instances
+            paginator = self.ec2.get_paginator('describe_instances')
+            for page in paginator.paginate(Filters=[self.TAG_FILTER]):
+                for reservation in page['Reservations']:
+                    for inst in reservation['Instances']:
+                        row = self._format_instance(inst)
+                        # Everything listed here matched our tag filter
+                        _KNOWN_OWNED.add(row.ID)
+                        yield row
         except ClientError as e:
             print(f"Debug: {e}")
-            return []
+
+    def list_instances(self):
+        """List only instances created by this CLI."""
+        return list(self.iter_instances())
+
+    def count_active(self):
+        """
+        Count CLI-created instances that are not terminated.
+        AWS filters by tag AND state, so only the instances we count come back.
+        """
+        paginator = self.ec2.get_paginator('describe_instances')
+        pages = paginator.paginate(Filters=[
+            self.TAG_FILTER,
+            {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'shutting-down', 'stopping', 'stopped']}
+        ])
+        return sum(len(r['Instances']) for page in pages for r in page['Reservations'])
 
     def create_instance(self, instance_type, name_tag, os_type):
         """
@@ -67,16 +109,18 @@ class EC2Manager:
         """
         
         # 1. Enforce Hard Cap
-        current_instances = self.list_instances()
-        active_count = sum(1 for i in current_instances if i['State'] != 'terminated')
+        try:
+            active_count = self.count_active()
+        except ClientError as e:
+            return OpResult(ok=False, error=str(e))
         
         if active_count >= 2:
-            return {"error": f"POLICY VIOLATION: Limit reached ({active_count}/2 instances)."}
+            return OpResult(ok=False, error=f"POLICY VIOLATION: Limit reached ({active_count}/2 instances).")
 
         # 2. Enforce Instance Type
         allowed_types = ['t2.small', 't3.micro']
         if instance_type not in allowed_types:
-            return {"error": f"POLICY VIOLATION: Type '{instance_type}' not allowed. Allowed: {allowed_types}"}
+            return OpResult(ok=False, error=f"POLICY VIOLATION: Type '{instance_type}' not allowed. Allowed: {allowed_types}")
 
         # 3. Create
         try:
@@ -84,8 +128,9 @@ class EC2Manager:
             # FIX WAS HERE: We now explicitly pass 'os_type' to the helper function
             ami_id = self._get_latest_ami(os_type)
             
-            tag_spec = format_as_ec2_tags('instance')
-            tag_spec[0]['Tags'].append({'Key': 'Name', 'Value': name_tag})
+            # The standard tag spec is cached and shared, so build a new one with the Name added
+            base = format_as_ec2_tags('instance')[0]
+            tag_spec = [{**base, 'Tags': base['Tags'] + [{'Key': 'Name', 'Value': name_tag}]}]
 
             response = self.ec2.run_instances(
                 ImageId=ami_id,
@@ -94,81 +139,81 @@ class EC2Manager:
                 MaxCount=1,
                 TagSpecifications=tag_spec
             )
-            return {"success": True, "id": response['Instances'][0]['InstanceId']}
+            instance_id = response['Instances'][0]['InstanceId']
+            _KNOWN_OWNED.add(instance_id)
+            return OpResult(ok=True, value=instance_id)
             
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
+
+    def manage_state(self, instance_ids, action):
+        """
+        Start, Stop, or Terminate (Delete) one or more instances.
+        Args:
+            instance_ids (str | list): a single ID or a list of IDs
+            action (str): 'start', 'stop' or 'delete'
+        All IDs are sent in ONE API call (EC2 accepts up to 1000 per request).
+        """
+        if isinstance(instance_ids, str):
+            instance_ids = [instance_ids]
+        if not instance_ids:
+            return OpResult(ok=False, error="No instances selected.")
 
-    def manage_state(self, instance_id, action):
-        """Start, Stop, or Terminate (Delete) an instance."""
         try:
-            # Check ownership
-            check = self.ec2.describe_instances(
-                InstanceIds=[instance_id],
-                Filters=[self.TAG_FILTER]
-            )
-            if not check['Reservations']:
-                return {"error": "Access Denied: Not a CLI-created instance."}
+            # Check ownership (every requested ID must be a CLI-created instance).
+            # Only IDs we haven't confirmed before cost an API call.
+            unknown = [i for i in instance_ids if i not in _KNOWN_OWNED]
+            if unknown:
+                check = self.ec2.describe_instances(
+                    InstanceIds=unknown,
+                    Filters=[self.TAG_FILTER]
+                )
+                owned = {inst['InstanceId'] for r in check['Reservations'] for inst in r['Instances']}
+                if owned != set(unknown):
+                    return OpResult(ok=False, error="Access Denied: Not a CLI-created instance.")
+                _KNOWN_OWNED.update(owned)
 
             if action == 'start':
-                self.ec2.start_instances(InstanceIds=[instance_id])
+                self.ec2.start_instances(InstanceIds=instance_ids)
             elif action == 'stop':
-                self.ec2.stop_instances(InstanceIds=[instance_id])
+                self.ec2.stop_instances(InstanceIds=instance_ids)
             elif action == 'delete':
-                self.ec2.terminate_instances(InstanceIds=[instance_id])
+                self.ec2.terminate_instances(InstanceIds=instance_ids)
             
-            return {"success": True}
+            return OpResult(ok=True)
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
 
     def update_instance(self, instance_id, new_type):
-        """Resize instance (Must be stopped)."""
-        try:
-            check = self.ec2.describe_instances(InstanceIds=[instance_id], Filters=[self.TAG_FILTER])
-            if not check['Reservations']:
-                return {"error": "Access Denied."}
-
-            state = check['Reservations'][0]['Instances'][0]['State']['Name']
-            if state != 'stopped':
-                return {"error": f"Cannot update running instance. Please STOP {instance_id} first."}
+        """
+        Resize instance (Must be stopped).
+        For an instance we already know is ours this is ONE call: AWS itself rejects
+        resizing a running instance, and we translate that error for the user.
+        """
+        allowed_types = ['t2.small', 't3.micro']
+        if new_type not in allowed_types:
+            return OpResult(ok=False, error=f"Type '{new_type}' not allowed.")
 
-            allowed_types = ['t2.small', 't3.micro']
-            if new_type not in allowed_types:
-                return {"error": f"Type '{new_type}' not allowed."}
+        try:
+            # Ownership check only for IDs we haven't confirmed before
+            if instance_id not in _KNOWN_OWNED:
+                check = self.ec2.describe_instances(InstanceIds=[instance_id], Filters=[self.TAG_FILTER])
+                if not check['Reservations']:
+                    return OpResult(ok=False, error="Access Denied.")
+                _KNOWN_OWNED.add(instance_id)
+                # We already have the state in hand, so fail early without the modify call
+                if check['Reservations'][0]['Instances'][0]['State']['Name'] != 'stopped':
+                    return OpResult(ok=False, error=f"Cannot update running instance. Please STOP {instance_id} first.")
 
             self.ec2.modify_instance_attribute(
                 InstanceId=instance_id,
                 InstanceType={'Value': new_type}
             )
-            return {"success": True}
-        except ClientError as e:
-            return {"error": str(e)}
-
-    def _get_latest_ami(self, os_type):
-        """
-        Helper: Fetches the latest AMI ID from AWS Systems Manager (SSM) Parameter Store.
-        This ensures we always launch the most secure, up-to-date version of the OS.
-        """
-        # Map our user-friendly names to AWS SSM Parameter paths
-        ami_map = {
-            'amazon_linux': '/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64',
-            'ubuntu': '/aws/service/canonical/ubuntu/server/24.04/stable/current/amd64/hvm/ebs-gp3/ami-id'
-        }
-
-        if os_type not in ami_map:
-            raise ValueError(f"Unknown OS type: {os_type}")
-
-        try:
-            # We create a temporary client just for SSM
-            # (Make sure 'import boto3' is at the top of your file!)
-            ssm_client = boto3.client('ssm')
-            
-            # Fetch the parameter
-            response = ssm_client.get_parameter(Name=ami_map[os_type])
-            
-            # Extract the actual AMI ID (e.g., "ami-012345...")
-            return response['Parameter']['Value']
-
+            return OpResult(ok=True)
         except ClientError as e:
-            # If SSM fails, we raise an error so create_instance can catch it
-            raise Exception(f"Failed to fetch dynamic AMI: {str(e)}")
+            code = e.response.get('Error', {}).get('Code', '')
+            if code == 'IncorrectInstanceState':
+                return OpResult(ok=False, error=f"Cannot update running instance. Please STOP {instance_id} first.")
+            if code in ('InvalidInstanceID.NotFound', 'InvalidInstanceID.Malformed', 'UnauthorizedOperation'):
+                return OpResult(ok=False, error="Access Denied.")
+            return OpResult(ok=False, error=str(e))
@@ -1,10 +1,19 @@
-import boto3
-import time
+import uuid
 from botocore.exceptions import ClientError
+from utils.aws_config import get_client
+from utils.results import OpResult, Zone, Record
+
+# Route53 allows 1000 record values per ChangeBatch and counts every UPSERT twice,
+# so 500 single-value changes is the most one call can safely carry.
+MAX_CHANGES_PER_BATCH = 500
+
+# Ownership verdict per zone ID ('Z...', no '/hostedzone/' prefix). The signature
+# comment is set at creation, so one lookup per zone per process is enough.
+_ZONE_OWNED = {}
 
 class Route53Manager:
     def __init__(self):
-        self.client = boto3.client('route53')
+        self.client = get_client('route53')
         self.signature = 'Created by Molcho Platform CLI'
 
     # --- PART 1: Zone Management (Domains) ---
@@ -12,7 +21,8 @@ class Route53Manager:
     def create_hosted_zone(self, domain_name, private_zone=False):
         """Create a new Route53 Hosted Zone."""
         try:
-            ref = f"molcho-cli-{int(time.time())}"
+            # Unique per call - a timestamp collides when two zones are created in the same second
+            ref = f"molcho-cli-{uuid.uuid4().hex}"
             config = {
                 'Comment': self.signature, 
                 'PrivateZone': private_zone
@@ -23,67 +33,109 @@ class Route53Manager:
                 CallerReference=ref,
                 HostedZoneConfig=config
             )
-            return {
-                "id": response['HostedZone']['Id'], 
-                "name": response['HostedZone']['Name']
-            }
+            zone_id = response['HostedZone']['Id']
+            _ZONE_OWNED[zone_id.split('/')[-1]] = True
+            return OpResult(ok=True, value=zone_id)
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
         except Exception as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
 
     # ALIAS: This allows the CLI to call 'create_zone' while the GUI calls 'create_hosted_zone'
     def create_zone(self, domain_name, private_zone=False):
         return self.create_hosted_zone(domain_name, private_zone)
 
-    def list_hosted_zones(self):
-        """List ONLY hosted zones created by this tool."""
+    def iter_hosted_zones(self):
+        """Yield hosted zones created by this tool, one at a time as pages arrive."""
         try:
-            response = self.client.list_hosted_zones()
-            my_zones = []
+            # The paginator walks every page (a single call stops at 100 zones)
+            paginator = self.client.get_paginator('list_hosted_zones')
             
-            for z in response['HostedZones']:
-                comment = z.get('Config', {}).get('Comment', '')
-                if comment == self.signature:
-                    my_zones.append({
-                        "Id": z['Id'],
-                        "Name": z['Name'],
-                        "Count": z['ResourceRecordSetCount'],
-                        "Private": z['Config']['PrivateZone']
-                    })
-            return my_zones
+            for page in paginator.paginate():
+                for z in page['HostedZones']:
+                    comment = z.get('Config', {}).get('Comment', '')
+                    if comment == self.signature:
+                        # Listed with our signature - no need to look it up again later
+                        _ZONE_OWNED[z['Id'].split('/')[-1]] = True
+                        yield Zone(
+                            Id=z['Id'],
+                            Name=z['Name'],
+                            Count=z['ResourceRecordSetCount'],
+                            Private=z['Config']['PrivateZone']
+                        )
         except ClientError as e:
             print(f"AWS Error: {e}")
-            return []
         except Exception as e:
             print(f"Error: {e}")
-            return []
+
+    def list_hosted_zones(self):
+        """List ONLY hosted zones created by this tool."""
+        return list(self.iter_hosted_zones())
 
     # --- PART 2: Record Management (DNS Records) ---
 
+    def _is_owned(self, zone_id):
+        """True if the hosted zone carries our signature comment (cached per process)."""
+        key = zone_id.split('/')[-1]
+        owned = _ZONE_OWNED.get(key)
+        if owned is None:
+            zone = self.client.get_hosted_zone(Id=key)['HostedZone']
+            owned = zone.get('Config', {}).get('Comment', '') == self.signature
+            _ZONE_OWNED[key] = owned
+        return owned
+
     def create_record(self, zone_id, record_name, record_type, record_value, ttl=300):
         """Create a DNS record (A, CNAME, TXT, etc)."""
-        try:
-            self.client.change_resource_record_sets(
-                HostedZoneId=zone_id,
-                ChangeBatch={
-                    'Comment': self.signature,
-                    'Changes': [{
-                        'Action': 'UPSERT',
-                        'ResourceRecordSet': {
-                            'Name': record_name,
-                            'Type': record_type,
-                            'TTL': int(ttl),
-                            'ResourceRecords': [{'Value': record_value}]
-                        }
-                    }]
+        return self.create_records(zone_id, [{
+            'name': record_name, 'type': record_type, 'value': record_value, 'ttl': ttl
+        }])
+
+    def create_records(self, zone_id, records):
+        """
+        Create/update many DNS records with as few API calls as possible.
+        Args:
+            zone_id (str): Hosted Zone ID
+            records (list): dicts with 'name', 'value' and optional 'type' (default A) / 'ttl' (default 300)
+        """
+        if not isinstance(records, list):
+            return OpResult(ok=False, error="Records must be a list of {'name': ..., 'value': ...} objects.")
+        changes = []
+        for i, r in enumerate(records):
+            if not isinstance(r, dict) or 'name' not in r or 'value' not in r:
+                return OpResult(ok=False, error=f"Record #{i + 1} must be an object with 'name' and 'value'.")
+            try:
+                ttl = int(r.get('ttl', 300))
+            except (TypeError, ValueError):
+                return OpResult(ok=False, error=f"Record #{i + 1} has an invalid ttl: {r['ttl']!r}.")
+            changes.append({
+                'Action': 'UPSERT',
+                'ResourceRecordSet': {
+                    'Name': r['name'],
+                    'Type': r.get('type', 'A'),
+                    'TTL': ttl,
+                    'ResourceRecords': [{'Value': r['value']}]
                 }
-            )
-            return {"success": True}
+            })
+        if not changes:
+            return OpResult(ok=False, error="No records given.")
+
+        try:
+            if not self._is_owned(zone_id):
+                return OpResult(ok=False, error="ACCESS DENIED: This zone was not created by this CLI.")
+
+            for i in range(0, len(changes), MAX_CHANGES_PER_BATCH):
+                self.client.change_resource_record_sets(
+                    HostedZoneId=zone_id,
+                    ChangeBatch={
+                        'Comment': self.signature,
+                        'Changes': changes[i:i + MAX_CHANGES_PER_BATCH]
+                    }
+                )
+            return OpResult(ok=True, value=len(changes))
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
         except Exception as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
 
     def delete_record(self, zone_id, record_name, record_type, record_value):
         """Delete a specific DNS record."""
@@ -102,30 +154,47 @@ class Route53Manager:
                     }]
                 }
             )
-            return {"success": True}
+            return OpResult(ok=True)
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
         except Exception as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
+
+    def _format_record(self, r):
+        """Flatten one raw ResourceRecordSet into the row shape the CLI/GUI show."""
+        if 'ResourceRecords' in r and len(r['ResourceRecords']) > 0:
+            value = r['ResourceRecords'][0]['Value']
+        else:
+            value = "Alias/Complex"
 
-    def list_records(self, zone_id):
-        """List all DNS records in a specific hosted zone."""
+        return Record(
+            Name=r['Name'],
+            Type=r['Type'],
+            TTL=r.get('TTL', '-'),
+            Value=value
+        )
+
+    def list_records(self, zone_id, start_name=None, max_items=None):
+        """
+        List DNS records in a specific hosted zone.
+        Optional window: AWS starts listing at 'start_name' (full record name) and
+        returns at most 'max_items' records, so big zones don't have to be read in full.
+        """
         try:
-            response = self.client.list_resource_record_sets(HostedZoneId=zone_id)
+            params = {'HostedZoneId': zone_id}
+            if start_name:
+                params['StartRecordName'] = start_name
+            if max_items:
+                # PageSize is what AWS sees (MaxItems alone only trims the answer afterwards)
+                params['PaginationConfig'] = {'MaxItems': max_items, 'PageSize': max_items}
+
+            # The paginator walks every page (a single call stops at 300 records)
+            paginator = self.client.get_paginator('list_resource_record_sets')
             
             clean_records = []
-            for r in response['ResourceRecordSets']:
-                if 'ResourceRecords' in r and len(r['ResourceRecords']) > 0:
-                    value = r['ResourceRecords'][0]['Value']
-                else:
-                    value = "Alias/Complex"
-
-                clean_records.append({
-                    "Name": r['Name'],
-                    "Type": r['Type'],
-                    "TTL": r.get('TTL', '-'),
-                    "Value": value
-                })
+            for page in paginator.paginate(**params):
+                for r in page['ResourceRecordSets']:
+                    clean_records.append(self._format_record(r))
             return clean_records
         except ClientError as e:
             print(f"AWS Error listing records: {e}")
@@ -133,3 +202,27 @@ class Route53Manager:
         except Exception as e:
             print(f"Error listing records: {e}")
             return []
+
+    def list_records_page(self, zone_id, starting_token=None, page_size=50):
+        """
+        Fetch ONE page of DNS records in a hosted zone (cursor based).
+        Returns {"records": [...], "next_token": str or None} -
+        pass next_token back in to get the following page.
+        """
+        try:
+            paginator = self.client.get_paginator('list_resource_record_sets')
+            result = paginator.paginate(
+                HostedZoneId=zone_id,
+                PaginationConfig={'MaxItems': page_size, 'PageSize': page_size, 'StartingToken': starting_token}
+            ).build_full_result()
+
+            clean_records = []
+            for r in result.get('ResourceRecordSets', []):
+                clean_records.append(self._format_record(r))
+            return {"records": clean_records, "next_token": result.get('NextToken')}
+        except ClientError as e:
+            print(f"AWS Error listing records: {e}")
+            return {"records": [], "next_token": None}
+        except Exception as e:
+            print(f"Error listing records: {e}")
+            return {"records": [], "next_token": None}
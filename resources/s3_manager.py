@@ -1,163 +1,366 @@
-import boto3
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 # We import the generic tag function since the structure (List of Dicts) is compatible
-from utils.tags import format_as_ec2_tags
+from utils.tags import format_as_ec2_tags, tags_to_dict
+from utils.aws_config import get_client, default_region
+from utils.results import OpResult, Bucket
+
+# Multipart settings for uploads: files above 8 MB are split into 8 MB
+# parts and up to 8 parts are sent in parallel (boto3 clients are thread-safe)
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Our standard tags in S3 TagSet form (same Key/Value list shape as EC2 uses)
+_OWN_TAGS = format_as_ec2_tags('s3')[0]['Tags']
+
+# Every bucket this CLI creates is named with this prefix. Ownership is still
+# decided by the tag alone (buckets from before the prefix are ours too).
+BUCKET_PREFIX = 'molcho-cli-'
+
+# The signature tag every CLI-created bucket carries
+_OWNER_TAG = ('CreatedBy', 'molcho-platform-cli')
+
+def _owned(tag_list):
+    """True if an S3 TagSet contains our signature tag."""
+    key, value = _OWNER_TAG
+    return tags_to_dict(tag_list).get(key) == value
+
+def _bucket_row(bucket):
+    """Bucket row from a raw list_buckets entry."""
+    return Bucket(Name=bucket['Name'], CreationDate=bucket['CreationDate'].strftime("%Y-%m-%d %H:%M"))
+
+# How many get_bucket_tagging calls list_buckets keeps in flight at once
+TAG_SCAN_WORKERS = 32
+
+# How many files upload_many sends at once. Each file goes up on a single
+# connection (MANY_TRANSFER_CONFIG), so at most 32 requests share the client's
+# 50-connection pool.
+UPLOAD_WORKERS = 32
+MANY_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=1,
+    use_threads=True
+)
+
+# Ownership verdict per bucket name. Tags are set once at creation, so one
+# get_bucket_tagging per bucket per process is enough; delete_bucket forgets
+# the name again because bucket names can be reused after deletion.
+_BUCKET_OWNED = {}
 
 class S3Manager:
-    def __init__(self, region='us-east-1'):
+    def __init__(self, region=None):
+        # Default to the region from your AWS Config (N. Virginia if none is set)
+        self.region = region or default_region()
+
+    @cached_property
+    def s3(self):
+        """The S3 client, built on first use (creating it loads the S3 service model)."""
         # We consistently use 'self.s3' everywhere now
-        self.s3 = boto3.client('s3', region_name=region)
-        self.region = region
+        return get_client('s3', self.region)
 
     def create_bucket(self, bucket_name, public=False):
         """
         Create an S3 bucket with tags and specific access settings.
         Handles Region LocationConstraint automatically.
+        The name gets BUCKET_PREFIX added if it doesn't start with it already;
+        the final name is returned in OpResult.value.
         """
+        if not bucket_name.startswith(BUCKET_PREFIX):
+            bucket_name = BUCKET_PREFIX + bucket_name
+
         try:
-            # 1. Detect the correct region from your AWS Config
-            session = boto3.session.Session()
-            current_region = session.region_name
-            
-            # If no region is configured, default to N. Virginia
-            if current_region is None:
-                current_region = 'us-east-1'
-
-            # 2. Create a FRESH client specifically for this region
-            # This bypasses any "background" defaults the server might force on self.s3
-            s3_client = boto3.client('s3', region_name=current_region)
-
-            # 3. Create Bucket with correct logic
-            if current_region == 'us-east-1':
+            # 1. Create Bucket with correct logic
+            # (self.region comes from your AWS Config, see __init__, and self.s3 is a client for it)
+            if self.region == 'us-east-1':
                 # Case A: N. Virginia (Global Endpoint)
-                s3_client.create_bucket(Bucket=bucket_name)
+                self.s3.create_bucket(Bucket=bucket_name)
             else:
                 # Case B: All other regions (Require Constraint)
-                s3_client.create_bucket(
+                self.s3.create_bucket(
                     Bucket=bucket_name,
-                    CreateBucketConfiguration={'LocationConstraint': current_region}
+                    CreateBucketConfiguration={'LocationConstraint': self.region}
                 )
 
-            # 4. Apply Tags (Ownership) using the new client
-            from utils.tags import format_as_ec2_tags
-            tag_data = format_as_ec2_tags('s3')
-            tags_list = tag_data[0]['Tags']
-            
-            s3_client.put_bucket_tagging(
-                Bucket=bucket_name,
-                Tagging={'TagSet': tags_list}
-            )
+            # 2. Apply Tags (Ownership) and 3. Configure Security (Public vs Private).
+            # The two calls don't depend on each other, so send them at the same time.
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                futures = [
+                    pool.submit(self.s3.put_bucket_tagging, Bucket=bucket_name, Tagging={'TagSet': _OWN_TAGS}),
+                    pool.submit(self._set_public_access, bucket_name, public)
+                ]
+            errors = [str(f.exception()) for f in futures if f.exception() is not None]
+            if errors:
+                return OpResult(ok=False, error="; ".join(errors))
 
-            # 5. Configure Security (Public vs Private) using the new client
-            if public:
-                s3_client.delete_public_access_block(Bucket=bucket_name)
-            else:
-                s3_client.put_public_access_block(
-                    Bucket=bucket_name,
-                    PublicAccessBlockConfiguration={
-                        'BlockPublicAcls': True,
-                        'IgnorePublicAcls': True,
-                        'BlockPublicPolicy': True,
-                        'RestrictPublicBuckets': True
-                    }
-                )
-
-            return {"success": True, "name": bucket_name, "status": "created"}
+            _BUCKET_OWNED[bucket_name] = True
+            return OpResult(ok=True, value=bucket_name)
 
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
         except Exception as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
 
-    def list_buckets(self):
-        """List only buckets created by this CLI (checked via Tags)."""
+    def _set_public_access(self, bucket_name, public):
+        """Open the bucket up (public=True) or turn on all four public-access blocks."""
+        if public:
+            self.s3.delete_public_access_block(Bucket=bucket_name)
+        else:
+            self.s3.put_public_access_block(
+                Bucket=bucket_name,
+                PublicAccessBlockConfiguration={
+                    'BlockPublicAcls': True,
+                    'IgnorePublicAcls': True,
+                    'BlockPublicPolicy': True,
+                    'RestrictPublicBuckets': True
+                }
+            )
+
+    def _is_owned(self, bucket_name):
+        """
+        True if the bucket carries our CreatedBy tag (cached per process).
+        A bucket without any tags is simply not ours; other AWS errors
+        (missing bucket, no access) are raised to the caller.
+        """
+        owned = _BUCKET_OWNED.get(bucket_name)
+        if owned is None:
+            try:
+                tag_list = self.s3.get_bucket_tagging(Bucket=bucket_name).get('TagSet', [])
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'NoSuchTagSet':
+                    raise
+                tag_list = []
+
+            owned = _owned(tag_list)
+            _BUCKET_OWNED[bucket_name] = owned
+        return owned
+
+    def _check_bucket_tags(self, bucket):
+        """Return a Bucket row if this raw list_buckets entry carries our tag, else None."""
         try:
-            response = self.s3.list_buckets()
-            my_buckets = []
-
-            print("Scanning buckets for tags (this might take a moment)...")
-            
-            for bucket in response['Buckets']:
-                name = bucket['Name']
-                
+            if not self._is_owned(bucket['Name']):
+                return None
+        except ClientError:
+            # No access to its tags - not ours
+            return None
+
+        return _bucket_row(bucket)
+
+    def _tagged_bucket_names(self, region):
+        """
+        Names of our buckets from the Resource Groups Tagging API: AWS does the
+        tag filtering, so this is one call per 100 buckets instead of one per bucket.
+        The Tagging API is regional - it sees the buckets located in 'region'.
+        """
+        paginator = get_client('resourcegroupstaggingapi', region).get_paginator('get_resources')
+        names = set()
+        for page in paginator.paginate(
+            TagFilters=[{'Key': 'CreatedBy', 'Values': ['molcho-platform-cli']}],
+            ResourceTypeFilters=['s3']
+        ):
+            for r in page['ResourceTagMappingList']:
+                # ARN format: arn:aws:s3:::bucket-name
+                names.add(r['ResourceARN'].split(':::')[-1])
+        return names
+
+    def iter_buckets(self):
+        """
+        Yield buckets created by this CLI, one at a time as listing pages arrive.
+        The list_buckets paginator keeps memory bounded on accounts with many buckets.
+        """
+        # Tagging API answer per bucket region (None = not allowed there)
+        tagged = {}
+
+        def _tagged_in(region):
+            if region not in tagged:
                 try:
-                    # Check tags
-                    tags = self.s3.get_bucket_tagging(Bucket=name)
-                    tag_list = tags.get('TagSet', [])
-                    
-                    # Look for our signature tag
-                    is_ours = False
-                    for t in tag_list:
-                        if t['Key'] == 'CreatedBy' and t['Value'] == 'molcho-platform-cli':
-                            is_ours = True
-                            break
-                    
-                    if is_ours:
-                        my_buckets.append({
-                            'Name': name,
-                            'CreationDate': bucket['CreationDate'].strftime("%Y-%m-%d %H:%M")
-                        })
-                        
+                    tagged[region] = self._tagged_bucket_names(region)
                 except ClientError:
-                    continue
+                    # e.g. no tag:GetResources permission - fall back to per-bucket tag checks
+                    tagged[region] = None
+                else:
+                    _BUCKET_OWNED.update(dict.fromkeys(tagged[region], True))
+            return tagged[region]
 
-            return my_buckets
+        paginator = self.s3.get_paginator('list_buckets')
+        scanning = False
+        try:
+            # One tag lookup per bucket the Tagging API can't vouch for, all of a page
+            # in flight at once (the client is thread-safe and its connection pool is sized for this)
+            with ThreadPoolExecutor(max_workers=TAG_SCAN_WORKERS) as pool:
+                for page in paginator.paginate():
+                    rows = []
+                    for b in page['Buckets']:
+                        # Fast path: the listing says where each bucket lives, so ask that
+                        # region's Tagging API once for all our buckets there.
+                        # Without BucketRegion (older APIs) we can't, so check the tags.
+                        region = b.get('BucketRegion')
+                        names = _tagged_in(region) if region else None
+                        if names is not None:
+                            # create_bucket's own verdict covers the Tagging API's indexing lag
+                            rows.append(_bucket_row(b) if b['Name'] in names or _BUCKET_OWNED.get(b['Name']) else None)
+                        else:
+                            # Same rule as the Tagging API and _is_owned: listed only if tagged
+                            if not scanning:
+                                print("Scanning buckets for tags (this might take a moment)...")
+                                scanning = True
+                            rows.append(pool.submit(self._check_bucket_tags, b))
+                    for row in rows:
+                        if row is not None and not isinstance(row, Bucket):
+                            row = row.result()
+                        if row is not None:
+                            yield row
         except ClientError as e:
-            return []
+            print(f"AWS Error: {e}")
 
-    def delete_bucket(self, bucket_name):
-        """Delete a bucket (must be empty and owned by CLI)."""
+    def list_buckets(self):
+        """List only buckets created by this CLI (checked via Tags)."""
+        return list(self.iter_buckets())
+
+    def _empty_bucket(self, bucket_name):
+        """
+        Delete every object in a bucket, up to 1000 keys per delete_objects call.
+        Returns the number of objects deleted. Raises ClientError if any key fails.
+        """
+        deleted = 0
+        paginator = self.s3.get_paginator('list_objects_v2')
+        # Pages hold up to 1000 keys - exactly what one delete_objects call accepts
+        for page in paginator.paginate(Bucket=bucket_name):
+            objects = [{'Key': o['Key']} for o in page.get('Contents', [])]
+            if not objects:
+                continue
+            response = self.s3.delete_objects(Bucket=bucket_name, Delete={'Objects': objects, 'Quiet': True})
+            errors = response.get('Errors', [])
+            if errors:
+                first = errors[0]
+                raise ClientError({'Error': {'Code': first.get('Code'), 'Message': f"Could not delete '{first.get('Key')}': {first.get('Message')}"}}, 'DeleteObjects')
+            deleted += len(objects)
+        return deleted
+
+    def delete_bucket(self, bucket_name, force=False):
+        """
+        Delete a bucket (owned by CLI).
+        The bucket must be empty, unless force=True - then its objects are deleted first.
+        """
         try:
             # 1. Verify Ownership (Safety Check)
-            try:
-                tags = self.s3.get_bucket_tagging(Bucket=bucket_name)
-                tag_list = tags.get('TagSet', [])
-                
-                is_ours = False
-                for t in tag_list:
-                    if t['Key'] == 'CreatedBy' and t['Value'] == 'molcho-platform-cli':
-                        is_ours = True
-                        break
-                
-                if not is_ours:
-                    return {"error": "Access Denied: You can only delete buckets created by this CLI."}
-            
-            except ClientError:
-                pass
+            if not self._is_owned(bucket_name):
+                return OpResult(ok=False, error="Access Denied: You can only delete buckets created by this CLI.")
+
+            if force:
+                self._empty_bucket(bucket_name)
 
             # 2. Perform Delete
             self.s3.delete_bucket(Bucket=bucket_name)
-            return {"success": True}
+            # The name is free again - someone else may create a bucket with it
+            _BUCKET_OWNED.pop(bucket_name, None)
+            return OpResult(ok=True)
 
         except ClientError as e:
             if "BucketNotEmpty" in str(e):
-                return {"error": "Bucket is not empty. Please empty it first."}
-            return {"error": str(e)}
+                return OpResult(ok=False, error="Bucket is not empty. Please empty it first (or use force delete).")
+            return OpResult(ok=False, error=str(e))
 
-    def upload_file(self, bucket_name, file_path, object_name=None):
-        """Upload a file to an S3 bucket."""
+    def upload_file(self, bucket_name, file_path, object_name=None, callback=None, transfer_config=TRANSFER_CONFIG):
+        """
+        Upload a file to an S3 bucket.
+        callback (optional) is called with the number of bytes sent after each chunk -
+        it may run on boto3's worker threads.
+        """
+        # 1. Verify Ownership
         try:
-            # 1. Verify Ownership
-            tags = self.s3.get_bucket_tagging(Bucket=bucket_name)
-            tag_list = tags.get('TagSet', [])
-            
-            is_ours = False
-            for t in tag_list:
-                if t['Key'] == 'CreatedBy' and t['Value'] == 'molcho-platform-cli':
-                    is_ours = True
-                    break
-            
-            if not is_ours:
-                return {"error": "Access Denied: This bucket was not created by this CLI."}
-
-            # 2. Upload
-            if object_name is None:
-                object_name = file_path
-
-            self.s3.upload_file(file_path, bucket_name, object_name)
-            return {"success": True, "file": object_name}
-
+            if not self._is_owned(bucket_name):
+                return OpResult(ok=False, error="Access Denied: This bucket was not created by this CLI.")
         except ClientError as e:
-            return {"error": str(e)}
+            return OpResult(ok=False, error=str(e))
+
+        # 2. Upload
+        if object_name is None:
+            object_name = file_path
+
+        try:
+            # Multipart + parallel for big files
+            self.s3.upload_file(file_path, bucket_name, object_name, Config=transfer_config, Callback=callback)
         except FileNotFoundError:
-            return {"error": f"The file '{file_path}' was not found."}
+            return OpResult(ok=False, error=f"The file '{file_path}' was not found.")
+        except (ClientError, S3UploadFailedError) as e:
+            # boto3's transfer manager wraps upload errors in S3UploadFailedError
+            return OpResult(ok=False, error=str(e))
+        return OpResult(ok=True, value=object_name)
+
+    def upload_many(self, bucket_names, file_paths):
+        """
+        Upload many files at once, spread over one or more owned buckets.
+        The key is the file's path (without leading '/', '.' or '..' parts) under a
+        2-hex-char prefix from its hash ('3f/site/fr/index.html'); the same hash picks
+        the bucket, so writes land on different S3 partitions instead of one.
+        Returns OpResult with value = [(file_path, bucket, key), ...] for the uploads
+        that worked; ok is False if any of them failed.
+        """
+        if not bucket_names or not file_paths:
+            return OpResult(ok=False, error="Nothing to upload.")
+
+        # Check every target once up front (cached, so the workers don't repeat it)
+        try:
+            for bucket_name in bucket_names:
+                if not self._is_owned(bucket_name):
+                    return OpResult(ok=False, error=f"Access Denied: Bucket '{bucket_name}' was not created by this CLI.")
+        except ClientError as e:
+            return OpResult(ok=False, error=str(e))
+
+        # Work out every target first: two files must never land on the same key,
+        # or one would silently overwrite the other
+        targets = {}
+        for file_path in file_paths:
+            parts = os.path.normpath(file_path).split(os.sep)
+            path_key = "/".join(p for p in parts if p not in ("", ".", ".."))
+            digest = hashlib.md5(path_key.encode(), usedforsecurity=False).hexdigest()
+            target = (bucket_names[int(digest, 16) % len(bucket_names)], f"{digest[:2]}/{path_key}")
+            if target in targets:
+                return OpResult(ok=False, error=f"'{file_path}' and '{targets[target]}' would both upload to s3://{target[0]}/{target[1]}.")
+            targets[target] = file_path
+
+        def _do_upload(item):
+            (bucket_name, key), file_path = item
+            result = self.upload_file(bucket_name, file_path, key, transfer_config=MANY_TRANSFER_CONFIG)
+            return file_path, bucket_name, result
+
+        uploaded, errors = [], []
+        with ThreadPoolExecutor(max_workers=min(UPLOAD_WORKERS, len(targets))) as pool:
+            for file_path, bucket_name, result in pool.map(_do_upload, targets.items()):
+                if result.ok:
+                    uploaded.append((file_path, bucket_name, result.value))
+                else:
+                    errors.append(f"{file_path}: {result.error}")
+
+        if errors:
+            return OpResult(ok=False, value=uploaded, error=f"{len(errors)} of {len(file_paths)} uploads failed. First: {errors[0]}")
+        return OpResult(ok=True, value=uploaded)
+
+    def upload_fileobj(self, bucket_name, fileobj, object_name):
+        """
+        Upload a file-like object (e.g. a Streamlit upload) straight to S3.
+        Streams from memory, so no temporary file is written to disk.
+        """
+        # 1. Verify Ownership
+        try:
+            if not self._is_owned(bucket_name):
+                return OpResult(ok=False, error="Access Denied: This bucket was not created by this CLI.")
+        except ClientError as e:
+            return OpResult(ok=False, error=str(e))
+
+        try:
+            # 2. Upload (multipart + parallel for big files)
+            self.s3.upload_fileobj(fileobj, bucket_name, object_name, Config=TRANSFER_CONFIG)
+        except (ClientError, S3UploadFailedError) as e:
+            return OpResult(ok=False, error=str(e))
+        return OpResult(ok=True, value=object_name)
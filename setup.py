@@ -6,6 +6,7 @@ setup(
     packages=find_packages(),
     py_modules=['molchoctl'],  # This includes your main script file
     include_package_data=True,
+    package_data={'resources': ['*.txt']},  # help banner + cheat sheet
     install_requires=[
         'Click',
         'boto3',
@@ -0,0 +1,89 @@
+import os
+import threading
+from functools import lru_cache
+
+from botocore.config import Config
+from botocore.session import get_session
+
+# Shared settings for every boto3 client the managers create:
+# - a bigger connection pool (default is 10) so parallel calls don't drop sockets
+# - adaptive retries to ride out AWS throttling
+# - TCP keep-alive so idle connections stay usable between calls
+CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True
+)
+
+# One botocore session for the whole process: service models and credentials are
+# loaded once and every client is built from it directly, skipping boto3's layer.
+# Sessions are not safe to build clients from in parallel, hence the lock.
+_SESSION = get_session()
+_CLIENT_LOCK = threading.Lock()
+
+
+def _warm_credentials():
+    """Resolve the credential chain (env, ~/.aws, SSO, IMDS...) so it's cached on _SESSION."""
+    try:
+        creds = _SESSION.get_credentials()
+        if creds is not None:
+            creds.get_frozen_credentials()
+    except Exception:
+        # Best effort only - the first real AWS call will surface any problem
+        pass
+
+
+# Credential lookup can take a few hundred ms (SSO refresh, instance metadata).
+# Start it in the background now; _build_client loads the service model while it
+# runs and then waits for it, so the chain is still resolved only once.
+# Set MOLCHOCTL_NO_WARM=1 to turn this off while debugging.
+_WARM_THREAD = None
+if not os.environ.get('MOLCHOCTL_NO_WARM'):
+    _WARM_THREAD = threading.Thread(target=_warm_credentials, name='molchoctl-warm-credentials', daemon=True)
+    _WARM_THREAD.start()
+
+# Services whose clients need boto3's extra methods (S3 upload_file/upload_fileobj)
+_BOTO3_SERVICES = {'s3'}
+
+
+@lru_cache(maxsize=1)
+def _boto3_session():
+    """
+    The boto3 wrapper around _SESSION. Built once: every boto3.Session registers
+    its handlers on the botocore session, and a second set breaks the next S3 client.
+    """
+    import boto3
+    return boto3.Session(botocore_session=_SESSION)
+
+
+@lru_cache(maxsize=None)
+def _build_client(service, region):
+    if _WARM_THREAD is not None:
+        # Parse the service's JSON model (cached on the session) while credentials
+        # resolve, then let the warm-up finish so create_client reuses its result
+        _SESSION.get_service_model(service)
+        _WARM_THREAD.join()
+    if service in _BOTO3_SERVICES:
+        # Wrap the same botocore session so models/credentials are still shared
+        return _boto3_session().client(service, region_name=region, config=CLIENT_CONFIG)
+    return _SESSION.create_client(service, region_name=region, config=CLIENT_CONFIG)
+
+
+def get_client(service, region=None):
+    """
+    Returns ONE shared AWS client per (service, region) for the whole process.
+    Building a client is slow (it loads the service's JSON model), and boto3
+    clients are thread-safe, so every manager reuses the same one.
+    """
+    with _CLIENT_LOCK:
+        return _build_client(service, region)
+
+
+@lru_cache(maxsize=None)
+def default_region():
+    """
+    The region from the user's AWS config/environment (same value boto3's
+    Session().region_name reports), falling back to N. Virginia.
+    Read once from the shared session instead of re-parsing config files per call.
+    """
+    return _SESSION.get_config_variable('region') or 'us-east-1'
@@ -0,0 +1,50 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class OpResult:
+    """
+    What every manager action (create/delete/start/upload...) returns.
+    Success: OpResult(ok=True, value=<id, name, ...>)
+    Failure: OpResult(ok=False, error="what went wrong")
+    """
+    ok: bool
+    value: Any = None
+    error: str | None = None
+
+
+# --- Row types for the list commands ---
+# One small slotted object per listed resource (no per-row __dict__), so big
+# accounts cost far less memory than a list of dicts. Field names match the
+# table/column headers the CLI and GUI already show.
+
+@dataclass(slots=True, frozen=True)
+class Instance:
+    ID: str
+    State: str
+    Type: str
+    Name: str
+    PublicIP: str
+
+
+@dataclass(slots=True, frozen=True)
+class Bucket:
+    Name: str
+    CreationDate: str
+
+
+@dataclass(slots=True, frozen=True)
+class Zone:
+    Id: str
+    Name: str
+    Count: int
+    Private: bool
+
+
+@dataclass(slots=True, frozen=True)
+class Record:
+    Name: str
+    Type: str
+    TTL: int | str
+    Value: str
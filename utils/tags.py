@@ -1,5 +1,10 @@
 import getpass  # library for sensitive user input
+from functools import lru_cache
 
+# Both results are computed once per process (the username can't change while we run).
+# The standard tags are an immutable tuple of (key, value) pairs; the boto3-shaped
+# list from format_as_ec2_tags is shared too - copy it before modifying.
+@lru_cache(maxsize=1)
 def get_standard_tags(): # getpass.getuser() gets the current shell username
 
     try:
@@ -7,20 +12,24 @@ def get_standard_tags(): # getpass.getuser() gets the current shell username
     except Exception:
         owner = "unknown"
 
-    return {
-        'CreatedBy': 'molcho-platform-cli',
-        'Owner': owner,
-        'Project': 'python-integrative-exercise'
-    }
+    return (
+        ('CreatedBy', 'molcho-platform-cli'),
+        ('Owner', owner),
+        ('Project', 'python-integrative-exercise')
+    )
 
 
-def format_as_ec2_tags(resource_type): # Converts a dict to a list of dicts that boto3.ec2 requires
+@lru_cache(maxsize=None)
+def format_as_ec2_tags(resource_type): # Converts the tag pairs to a list of dicts that boto3.ec2 requires
 
-    tags_dict = get_standard_tags()
-
-    ec2_tags = [{'Key': k, 'Value': v} for k, v in tags_dict.items()]
+    ec2_tags = [{'Key': k, 'Value': v} for k, v in get_standard_tags()]
 
     return [{
         'ResourceType': resource_type,
         'Tags': ec2_tags
     }]
+
+
+def tags_to_dict(tag_list): # Converts boto3's [{'Key': k, 'Value': v}, ...] back into {k: v}
+
+    return {t['Key']: t['Value'] for t in tag_list}